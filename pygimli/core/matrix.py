@@ -22,6 +22,38 @@ SparseMatrix = pgcore.RSparseMatrix
 Matrix = pgcore.RMatrix
 
 
+def _multMany(A, X):
+    """Return A*X for the columns of X (n x k) in one call where possible.
+
+    Uses A.multMany or A.dot (numpy/scipy matrices) so that A is traversed
+    only once for all k vectors, otherwise falls back to one A.mult per
+    column.
+    """
+    if hasattr(A, 'multMany'):
+        return A.multMany(X)
+    if hasattr(A, 'dot') and not isinstance(A, pgcore.MatrixBase):
+        return np.asarray(A.dot(X))
+    # contiguous columns are copied by the core at once, not per element
+    return np.column_stack([A.mult(np.ascontiguousarray(X[:, i]))
+                            for i in range(X.shape[1])])
+
+
+def _intoOut(y, out):
+    """Return y, or y copied into the output array out if given."""
+    if out is None or y is out:
+        return y
+    out[...] = y
+    return out
+
+
+def _scale(y, v, out):
+    """Return y*v elementwise, into out if given, else in place of y."""
+    if out is None:
+        y *= v
+        return y
+    return np.multiply(y, v, out=out)
+
+
 class MultMatrix(pgcore.MatrixBase):
     """Base Matrix class for all matrix types holding a matrix."""
     def __init__(self, A, verbose=False):
@@ -39,11 +71,12 @@ class MultMatrix(pgcore.MatrixBase):
 
     def rows(self):
         """Return number of rows (using underlying matrix)."""
-        return self.A.rows()  # this should be _A
+        # not cached, core matrices (e.g. Jacobians) are resized in place
+        return self._A.rows()
 
     def cols(self):
         """Return number of columns (using underlying matrix)."""
-        return self.A.cols()  # this should be _A
+        return self._A.cols()
 
     def save(self, filename):
         """So it can be used in inversion with dosave flag"""
@@ -69,13 +102,25 @@ class MultLeftMatrix(MultMatrix):
     def r(self, l):
         self._l = l
 
-    def mult(self, x):
-        """Multiplication from right-hand-side (dot product A*x)."""
-        return self.A.mult(x) * self.l
+    def mult(self, x, out=None):
+        """Multiplication from right-hand-side (dot product A*x).
 
-    def transMult(self, x):
-        """Multiplication from right-hand-side (dot product A.T * x)"""
-        return self.A.transMult(x * self.l)
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        return _scale(self.A.mult(x), self.l, out)
+
+    def transMult(self, x, out=None):
+        """Multiplication from right-hand-side (dot product A.T * x).
+
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        return _intoOut(self.A.transMult(x * self.l), out)
 
 
 LMultRMatrix = MultLeftMatrix  # alias for backward compatibility
@@ -92,6 +137,8 @@ class MultRightMatrix(MultMatrix):
         else:
             self._r = r
 
+        self._perm = None
+
     @property
     def r(self):
         return self._r
@@ -100,23 +147,56 @@ class MultRightMatrix(MultMatrix):
     def r(self, r):
         self._r = r
 
-    def mult(self, x):
-        """Return M*x = A*(r*x)"""
-        if hasattr(x, '__len__') and hasattr(self.r, '__len__'):
-            if len(x) != len(self.r):
+    @property
+    def perm(self):
+        """Index into x applied if x does not fit r (A being complex)."""
+        return self._perm
+
+    @perm.setter
+    def perm(self, perm):
+        self._perm = perm
+
+    def mult(self, x, out=None):
+        """Return M*x = A*(r*x).
+
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        if out is not None:
+            return _intoOut(self.mult(x), out)
+        if self._perm is None:  # only then x can differ in length from r
+            return self.A.mult(x * self._r)
+
+        if hasattr(x, '__len__') and hasattr(self._r, '__len__'):
+            if len(x) != len(self._r):
                 # assuming A was complex
-                # warn('need to double x')
-                # print('mult:', self.A.rows(), " x " , self.A.cols(),
-                #        'x:', len(x), 'r:', len(self.r))
-                # print(self.perm)
-                return self.A.mult(x[self.perm] * self.r)
+                return self.A.mult(x[self._perm] * self._r)
                 # return self.A.mult(pgcore.cat(x, x) * self.r)
-        return self.A.mult(x * self.r)
+        return self.A.mult(x * self._r)
+
+    def multMany(self, X):
+        """Return M*X = A*(r*X) for several vectors stacked in X (n x k)."""
+        X = np.asarray(X)
+        r = self._r
+        if hasattr(r, '__len__'):  # r can also be a scalar, see mult
+            r = np.asarray(r)[:, np.newaxis]
+            if self._perm is not None and len(X) != len(r):
+                X = X[self._perm]
+        # Fortran order keeps the columns contiguous for the core
+        return _multMany(self.A, np.asfortranarray(X * r))
+
+    def transMult(self, x, out=None):
+        """Return M.T*x=(A.T*x)*r.
 
-    def transMult(self, x):
-        """Return M.T*x=(A.T*x)*r"""
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
         # print('transmult', self.A.rows(), " x " , self.A.cols(), x, self.r, )
-        return self.A.transMult(x) * self.r
+        return _scale(self.A.transMult(x), self.r, out)
 
 
 RMultRMatrix = MultRightMatrix  # alias for backward compatibility
@@ -133,8 +213,8 @@ class MultLeftRightMatrix(MultMatrix):
             raise Exception("Matrix rows do not fit left vector length!")
 
         super(MultLeftRightMatrix, self).__init__(A, verbose)
-        self._r = right
-        self._l = left
+        self.r = right
+        self.l = left
 
     @property
     def l(self):
@@ -143,6 +223,7 @@ class MultLeftRightMatrix(MultMatrix):
     @l.setter
     def l(self, l):
         self._l = l
+        self._xl = np.empty(len(l))  # reused buffer for x*l
 
     @property
     def r(self):
@@ -151,14 +232,36 @@ class MultLeftRightMatrix(MultMatrix):
     @r.setter
     def r(self, r):
         self._r = r
+        self._xr = np.empty(len(r))  # reused buffer for x*r
 
-    def mult(self, x):
-        """Multiplication from right-hand-side (dot product A*x)."""
-        return self.A.mult(x * self._r) * self._l
+    def mult(self, x, out=None):
+        """Multiplication from right-hand-side (dot product A*x).
 
-    def transMult(self, x):
-        """Multiplication from right-hand-side (dot product A.T*x)."""
-        return self.A.transMult(x * self._l) * self._r
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        np.multiply(x, self._r, out=self._xr)
+        return _scale(self.A.mult(self._xr), self._l, out)
+
+    def multMany(self, X):
+        """Return M*X = l*A*(r*X) for several vectors stacked in X (n x k)."""
+        XR = np.asarray(X) * np.asarray(self._r)[:, np.newaxis]
+        Y = _multMany(self.A, np.asfortranarray(XR))
+        Y *= np.asarray(self._l)[:, np.newaxis]
+        return Y
+
+    def transMult(self, x, out=None):
+        """Multiplication from right-hand-side (dot product A.T*x).
+
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        np.multiply(x, self._l, out=self._xl)
+        return _scale(self.A.transMult(self._xl), self._r, out)
 
 
 LRMultRMatrix = MultLeftRightMatrix  # alias for backward compatibility
@@ -166,6 +269,19 @@ LRMultRMatrix = MultLeftRightMatrix  # alias for backward compatibility
 __BlockMatrix_addMatrix__ = pgcore.RBlockMatrix.addMatrix
 
 
+def _transposeSparseMap(M):
+    """Return the transpose of a SparseMapMatrix.
+
+    The triples are filled into core arrays and passed back with swapped
+    row and column indices.
+    """
+    v = pg.RVector()
+    i = pg.IndexArray(0)
+    j = pg.IndexArray(0)
+    M.fillArrays(v, i, j)
+    return SparseMapMatrix(j, i, v)
+
+
 def __BlockMatrix_addMatrix_happy_GC__(self, M, row=None, col=None,
                                        scale=1.0, transpose=False):
     """Add an existing matrix to this block matrix and return a unique index.
@@ -195,27 +311,29 @@ def __BlockMatrix_addMatrix_happy_GC__(self, M, row=None, col=None,
         Transpose the matrix.
     """
     if M.ndim == 1:
+        idx = list(range(len(M)))  # converted element by element by the core
+        zeros = pg.IndexArray(len(M))  # allocated zero-filled by the core
         if transpose is False:
-            _M = SparseMapMatrix(list(range(len(M))), [0]*len(M), M)
+            _M = SparseMapMatrix(idx, zeros, M)
         else:
-            _M = SparseMapMatrix([0]*len(M), list(range(len(M))), M)
+            _M = SparseMapMatrix(zeros, idx, M)
         M = _M
     else:
         if transpose is True:
             if isinstance(M, pgcore.RSparseMapMatrix):
                 warn('Move me to core')
-                v = pg.RVector()
-                i = pg.IndexArray([0])
-                j = pg.IndexArray([0])
-                M.fillArrays(v, i, j)
-                M = SparseMapMatrix(j, i, v)
+                M = _transposeSparseMap(M)
             else:
                 critical("don't know yet how to add transpose matrix of type",
                          type(M))
 
     if not hasattr(self, '__mats__'):
-        self.__mats__ = []
-    self.__mats__.append(M)
+        __BlockMatrix_reserve__(self, 0)
+    if self.__nMats__ < len(self.__mats__):
+        self.__mats__[self.__nMats__] = M
+    else:
+        self.__mats__.append(M)
+    self.__nMats__ += 1
 
     matrixID = __BlockMatrix_addMatrix__(self, M)
 
@@ -224,8 +342,27 @@ def __BlockMatrix_addMatrix_happy_GC__(self, M, row=None, col=None,
 
     return matrixID
 
+
+def __BlockMatrix_reserve__(self, n):
+    """Reserve room for references to n matrices to be added.
+
+    Useful before adding many matrices so the list keeping them alive is
+    allocated only once.
+
+    Parameters
+    ----------
+    n: int
+        Total number of matrices expected to be added.
+    """
+    if not hasattr(self, '__mats__'):
+        self.__mats__ = []
+        self.__nMats__ = 0
+    if n > len(self.__mats__):
+        self.__mats__.extend([None] * (n - len(self.__mats__)))
+
 pgcore.RBlockMatrix.addMatrix = __BlockMatrix_addMatrix_happy_GC__
 pgcore.RBlockMatrix.add = __BlockMatrix_addMatrix_happy_GC__
+pgcore.RBlockMatrix.reserve = __BlockMatrix_reserve__
 # pgcore.CBlockMatrix.addMatrix = __BlockMatrix_addMatrix_happy_GC__
 # pgcore.CBlockMatrix.add = __BlockMatrix_addMatrix_happy_GC__
 
@@ -240,13 +377,33 @@ class Add2Matrix(pgcore.MatrixBase):
         assert A.rows() == B.rows()
         assert A.cols() == B.cols()
 
-    def mult(self, x):
-        """Return M*x = A*(r*x)"""
-        return self.A.mult(x) + self.B.mult(x)
+    def mult(self, x, out=None):
+        """Return M*x = A*(r*x).
 
-    def transMult(self, x):
-        """Return M.T*x=(A.T*x)*r"""
-        return self.A.transMult(x) + self.B.transMult(x)
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        y = self.A.mult(x)
+        if out is not None:
+            return np.add(y, self.B.mult(x), out=out)
+        y += self.B.mult(x)  # accumulate into the fresh result of A
+        return y
+
+    def transMult(self, x, out=None):
+        """Return M.T*x=(A.T*x)*r.
+
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        y = self.A.transMult(x)
+        if out is not None:
+            return np.add(y, self.B.transMult(x), out=out)
+        y += self.B.transMult(x)
+        return y
 
     def cols(self):
         """Number of columns."""
@@ -260,19 +417,83 @@ class Add2Matrix(pgcore.MatrixBase):
 class Mult2Matrix(pgcore.MatrixBase):
     """Matrix  by multiplying two matrices."""
 
-    def __init__(self, A, B):
+    def __init__(self, A, B, cacheProduct=False):
+        """Constructor saving both matrices.
+
+        Parameters
+        ----------
+        A, B : pg.MatrixBase
+            left and right matrix
+        cacheProduct : bool [False]
+            if A and B are both dense (pg.Matrix) and their product is not
+            larger than the two factors, form A*B once at the first
+            multiplication; A and B must then not be changed in place
+            (e.g. Jacobians refilled by createJacobian) unless reassigned
+        """
         super().__init__()
+        self.cacheProduct = cacheProduct
         self.A = A
         self.B = B
         assert A.cols() == B.rows()
 
-    def mult(self, x):
-        """Return M*x = A*(r*x)"""
-        return self.A.mult(self.B.mult(x))
+    @property
+    def A(self):
+        return self._A
 
-    def transMult(self, x):
-        """Return M.T*x=(A.T*x)*r"""
-        return self.B.transMult(self.A.transMult(x))
+    @A.setter
+    def A(self, A):
+        self._A = A
+        self._AB = None
+
+    @property
+    def B(self):
+        return self._B
+
+    @B.setter
+    def B(self, B):
+        self._B = B
+        self._AB = None
+
+    def _denseProduct(self):
+        """Return cached dense A*B as numpy array or False if not useful."""
+        if self._AB is None:
+            self._AB = False
+            if not self.cacheProduct:
+                return self._AB
+
+            m, k, n = self._A.rows(), self._A.cols(), self._B.cols()
+            if isinstance(self._A, pgcore.RMatrix) and \
+                    isinstance(self._B, pgcore.RMatrix) and \
+                    min(m, k, n) > 0 and m*n <= k*(m+n):
+                from pygimli.utils.base import gmat2numpy
+                self._AB = np.dot(gmat2numpy(self._A), gmat2numpy(self._B))
+        return self._AB
+
+    def mult(self, x, out=None):
+        """Return M*x = A*(r*x).
+
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        AB = self._denseProduct()
+        if AB is not False:
+            return _intoOut(AB.dot(np.asarray(x)), out)
+        return _intoOut(self.A.mult(self.B.mult(x)), out)
+
+    def transMult(self, x, out=None):
+        """Return M.T*x=(A.T*x)*r.
+
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        AB = self._denseProduct()
+        if AB is not False:
+            return _intoOut(AB.T.dot(np.asarray(x)), out)
+        return _intoOut(self.B.transMult(self.A.transMult(x)), out)
 
     def cols(self):
         """Number of columns."""
@@ -290,13 +511,25 @@ class DiagonalMatrix(pgcore.MatrixBase):
         super().__init__()
         self.d = d
 
-    def mult(self, x):
-        """Return M*x = r*x (element-wise)"""
-        return x * self.d
+    def mult(self, x, out=None):
+        """Return M*x = r*x (element-wise).
 
-    def transMult(self, x):
-        """Return M.T*x=(A.T*x)*r"""
-        return x * self.d
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        return np.multiply(x, self.d, out=out)
+
+    def transMult(self, x, out=None):
+        """Return M.T*x=(A.T*x)*r.
+
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        return np.multiply(x, self.d, out=out)
 
     def cols(self):
         """Number of columns (length of diagonal)."""
@@ -310,27 +543,71 @@ class DiagonalMatrix(pgcore.MatrixBase):
 class Cm05Matrix(pgcore.MatrixBase):
     """Matrix implicitly representing the inverse square-root."""
 
-    def __init__(self, A, verbose=False):
+    def __init__(self, A, verbose=False, maxDense=512, dtype=float,
+                 device='cpu'):
         """Constructor saving matrix and vector.
 
         Parameters
         ----------
         A : ndarray
             numpy type (full) matrix
+        maxDense : float [512]
+            memory limit in MB up to which the inverse root matrix is formed
+            explicitly so that mult needs a single (symmetric) matrix-vector
+            product instead of two; use 0 to always keep the eigenvectors
+        dtype : numpy dtype [float]
+            precision of decomposition and products, e.g. np.float32 halves
+            memory and time if used for regularization only; results are
+            always returned in double precision
+        device : str ['cpu']
+            'cuda' keeps the matrices on the GPU (needs cupy) which pays off
+            for large models of several thousand cells
         """
-        from scipy.linalg import eigh  # , get_blas_funcs
+        from scipy.linalg import eigh, get_blas_funcs
 
         if A.shape[0] != A.shape[1]:  # rows/cols for pgcore matrix
             raise Exception("Matrix must by square (and symmetric)!")
+        if device not in ('cpu', 'cuda'):
+            raise Exception("Unknown device {}, use 'cpu' or 'cuda'!".format(
+                device))
 
         self.size = A.shape[0]
+        self.dtype = np.dtype(dtype)
         t = time.time()
-        self.ew, self.EV = eigh(A)
+        self.ew, EV = eigh(np.asarray(A, dtype=self.dtype, order='F'),
+                           driver='evd', check_finite=False)
+        # Fortran order lets gemv run EV*x and EV.T*x on the same buffer
+        self.EV = np.asfortranarray(EV)
         self.mul = np.sqrt(1./self.ew)
+        self._gemv = get_blas_funcs('gemv', (self.EV,))
         if verbose:
             pgcore.info('(C) Time for eigenvalue decomposition:{:.1f}s'.format(
                 time.time() - t))
 
+        self.M = None
+        if self.size**2 * self.dtype.itemsize < maxDense * 1024**2:
+            # symmetric, so the transpose is a Fortran-ordered view of it
+            self.M = np.dot(self.EV * self.mul, self.EV.T).T
+            self._symv = get_blas_funcs('symv', (self.M,))
+            self.EV = None
+            self.ew = None
+
+        self._cp = None
+        if device == 'cuda':
+            from .load import optImport
+            self._cp = optImport('cupy', requiredFor='use the GPU')
+            if self._cp is None:
+                warn('Falling back to CPU for Cm05Matrix.')
+            elif self.M is not None:
+                self.M = self._cp.asarray(self.M)
+            else:
+                self.EV = self._cp.asarray(self.EV, order='F')
+                self.mul = self._cp.asarray(self.mul)
+
+            if self._cp is not None:
+                # device input buffer avoids an allocation per call
+                self._xd = self._cp.empty(self.size, dtype=self.dtype)
+
         self.A = A
         super().__init__(verbose)  # only in Python 3
 
@@ -342,15 +619,117 @@ class Cm05Matrix(pgcore.MatrixBase):
         """Return number of columns (using underlying matrix)."""
         return self.size
 
-    def mult(self, x):
-        """Multiplication from right-hand side (dot product)."""
-        part1 = (np.dot(np.transpose(x), self.EV).T*self.mul).reshape(-1, 1)
-        return self.EV.dot(part1).reshape(-1,)
-#        return self.EV.dot((x.T.dot(self.EV)*self.mul).T)
+    def mult(self, x, out=None):
+        """Multiplication from right-hand side (dot product).
 
-    def transMult(self, x):
-        """Multiplication from right-hand side (dot product)."""
-        return self.mult(x)  # matrix is symmetric by definition
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        x = np.asarray(x, dtype=self.dtype)
+        if self._cp is not None:
+            return _intoOut(self._multDevice(x), out)
+
+        kw = {}
+        if out is not None and out.dtype == self.dtype and \
+                not np.may_share_memory(out, x):
+            kw = dict(y=out, overwrite_y=True)  # let BLAS write into out
+
+        if self.M is not None:
+            y = self._symv(1.0, self.M, x, **kw)
+        else:
+            # EV is streamed twice; cache tiling does not help here since the
+            # second product needs the complete result of the first one
+            y = self._gemv(1.0, self.EV, x, trans=1)
+            y *= self.mul
+            y = self._gemv(1.0, self.EV, y, **kw)
+        return _intoOut(y.astype(float, copy=False), out)
+
+    def multMany(self, X):
+        """Return M*X for several vectors stacked in X (n x k).
+
+        Uses matrix-matrix products so that the matrices are read only once
+        for all k vectors.
+        """
+        X = np.asarray(X, dtype=self.dtype)
+        if self._cp is not None:
+            X = self._cp.asarray(X)
+
+        if self.M is not None:
+            Y = self.M.dot(X)
+        else:
+            Y = self.EV.dot(self.EV.T.dot(X) * self.mul[:, np.newaxis])
+
+        if self._cp is not None:
+            Y = self._cp.asnumpy(Y)
+        return Y.astype(float, copy=False)
+
+    def _multDevice(self, x):
+        """Multiplication with matrices held on the GPU."""
+        self._xd.set(x)
+        if self.M is not None:
+            y = self.M.dot(self._xd)
+        else:
+            y = self.EV.T.dot(self._xd)
+            y *= self.mul
+            y = self.EV.dot(y)
+        return self._cp.asnumpy(y).astype(float, copy=False)
+
+    def transMult(self, x, out=None):
+        """Multiplication from right-hand side (dot product).
+
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        return self.mult(x, out)  # matrix is symmetric by definition
+
+
+_ndKernels = None  # numba kernels of BlockDiagonalMatrix, compiled on use
+
+
+def _ndMultKernels():
+    """Return numba kernels for BlockDiagonalMatrix products or (None, None).
+
+    numba is optional and only imported on the first product, so it does
+    not add to the import time of pygimli.
+    """
+    global _ndKernels
+    if _ndKernels is not None:
+        return _ndKernels
+
+    try:
+        import numba
+    except ImportError:  # silently fall back to numpy
+        _ndKernels = (None, None)
+        return _ndKernels
+
+    njit, prange = numba.njit, numba.prange
+
+    @njit(parallel=True, fastmath=True)
+    def _ndMult(data, x, y):
+        """Block-diagonal matrix-vector product, parallel over blocks."""
+        for b in prange(data.shape[0]):
+            for i in range(data.shape[1]):
+                s = 0.0
+                for j in range(data.shape[2]):
+                    s += data[b, i, j] * x[b, j]
+                y[b, i] = s
+
+    @njit(parallel=True, fastmath=True)
+    def _ndTransMult(data, x, y):
+        """Transposed block-diagonal product, parallel over blocks."""
+        for b in prange(data.shape[0]):
+            for j in range(data.shape[2]):
+                y[b, j] = 0.0
+            for i in range(data.shape[1]):
+                for j in range(data.shape[2]):
+                    y[b, j] += data[b, i, j] * x[b, i]
+
+    _ndKernels = (_ndMult, _ndTransMult)
+    return _ndKernels
 
 
 class NDMatrix(BlockMatrix):
@@ -372,6 +751,56 @@ class NDMatrix(BlockMatrix):
         print(self.rows(), self.cols())
 
 
+class BlockDiagonalMatrix(pgcore.MatrixBase):
+    """Diagonal block (block-Jacobi) matrix of equally sized dense blocks.
+
+    Alternative to NDMatrix for many small blocks: all blocks share one
+    contiguous (num, nrows, ncols) array so that the matrix-vector products
+    run over all blocks at once. The individual blocks are available as
+    numpy array views in the list Ji.
+
+    Only mult, transMult, rows and cols are provided, the blocks cannot be
+    passed to core functions as pg.Matrix. Use NDMatrix for that.
+    """
+
+    def __init__(self, num, nrows, ncols):
+        super(BlockDiagonalMatrix, self).__init__()
+        self._data = np.zeros((num, nrows, ncols))
+        self.Ji = list(self._data)  # views on the individual block matrices
+
+    def mult(self, x):
+        """Return M*x by multiplying every block with its part of x."""
+        num, nrows, ncols = self._data.shape
+        X = np.asarray(x, dtype=float).reshape(num, ncols)
+        _ndMult = _ndMultKernels()[0]
+        if _ndMult is None:
+            return np.einsum('bij,bj->bi', self._data, X).ravel()
+
+        Y = np.empty((num, nrows))
+        _ndMult(self._data, X, Y)
+        return Y.ravel()
+
+    def transMult(self, x):
+        """Return M.T*x by multiplying every transposed block."""
+        num, nrows, ncols = self._data.shape
+        X = np.asarray(x, dtype=float).reshape(num, nrows)
+        _ndTransMult = _ndMultKernels()[1]
+        if _ndTransMult is None:
+            return np.einsum('bij,bi->bj', self._data, X).ravel()
+
+        Y = np.empty((num, ncols))
+        _ndTransMult(self._data, X, Y)
+        return Y.ravel()
+
+    def rows(self):
+        """Return number of rows (sum over all blocks)."""
+        return self._data.shape[0] * self._data.shape[1]
+
+    def cols(self):
+        """Return number of columns (sum over all blocks)."""
+        return self._data.shape[0] * self._data.shape[2]
+
+
 class GeostatisticConstraintsMatrix(pg.MatrixBase):
     """Geostatistic constraints matrix
 
@@ -401,24 +830,72 @@ class GeostatisticConstraintsMatrix(pg.MatrixBase):
             angle of main axis corresponding to I[0] versus I[1] (3D)
         withRef : bool [False]
             neglect spur (reference model effect) that is otherwise corrected
+        dtype : numpy dtype [float]
+            working precision of the inverse root matrix (see Cm05Matrix),
+            np.float32 halves memory and time of the products if the matrix
+            is only used for regularization or preconditioning
+        maxDense : float [512]
+            memory limit in MB for forming the inverse root matrix explicitly
+            (see Cm05Matrix)
+        device : str ['cpu']
+            'cuda' computes the products on the GPU (see Cm05Matrix)
         """
         super().__init__()
+        withRef = kwargs.pop('withRef', False)
+        dtype = kwargs.pop('dtype', float)
+        maxDense = kwargs.pop('maxDense', 512)
+        device = kwargs.pop('device', 'cpu')
         if isinstance(CM, pg.Mesh):
             CM = covarianceMatrix(CM, **kwargs)
         if CM is None:
             CM = covarianceMatrix(mesh, **kwargs)
 
         self.nModel = CM.shape[0]
-        self.CM05 = Cm05Matrix(CM)
-        self.spur = self.CM05 * pg.RVector(self.nModel, 1.0)
-        if kwargs.pop('withRef', False):
-            self.spur *= 0.0
+        self.CM05 = Cm05Matrix(CM, maxDense=maxDense, dtype=dtype,
+                               device=device)
+        if withRef:
+            self.spur = np.zeros(self.nModel)
+            # nothing to correct, so use the inverse root matrix directly
+            self.mult = self.CM05.mult
+            self.transMult = self.CM05.transMult
+            self.multMany = self.CM05.multMany
+        else:
+            self.spur = np.array(self.CM05 * pg.RVector(self.nModel, 1.0))
 
-    def mult(self, x):
-        return self.CM05.mult(x) - self.spur * x
+        self._tmp = np.empty(self.nModel)  # reused for spur * x
 
-    def transMult(self, x):
-        return self.CM05.transMult(x) - self.spur * x
+    def mult(self, x, out=None):
+        """Return M*x = CM05*x - spur*x.
+
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        np.multiply(self.spur, x, out=self._tmp)  # before out may overwrite x
+        y = self.CM05.mult(x, out)
+        np.subtract(y, self._tmp, out=y)
+        return y
+
+    def transMult(self, x, out=None):
+        """Return M.T*x = M*x (symmetric).
+
+        Parameters
+        ----------
+        out : ndarray [None]
+            numpy array (not pg.Vector) the result is written into
+        """
+        np.multiply(self.spur, x, out=self._tmp)
+        y = self.CM05.transMult(x, out)
+        np.subtract(y, self._tmp, out=y)
+        return y
+
+    def multMany(self, X):
+        """Return M*X for several vectors stacked in X (n x k)."""
+        X = np.asarray(X)
+        Y = self.CM05.multMany(X)
+        Y -= self.spur[:, np.newaxis] * X
+        return Y
 
     def cols(self):
         return self.nModel
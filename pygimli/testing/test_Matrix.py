@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests for the Python matrix specializations in pygimli.core.matrix."""
+import importlib.util
+import unittest
+
+import numpy as np
+
+import pygimli as pg
+from pygimli.core.matrix import (Add2Matrix, BlockDiagonalMatrix, Cm05Matrix,
+                                 DiagonalMatrix, GeostatisticConstraintsMatrix,
+                                 Mult2Matrix, MultLeftMatrix,
+                                 MultLeftRightMatrix, MultRightMatrix, NDMatrix, _ndMultKernels)
+
+
+def _covariance(n=20, corrLength=3.):
+    """Simple symmetric positive definite exponential covariance matrix."""
+    x = np.arange(n, dtype=float)
+    return np.exp(-np.abs(x[:, None] - x[None, :]) / corrLength)
+
+
+def _matrix(D):
+    """Dense core matrix (pg.Matrix) with the entries of numpy array D."""
+    A = pg.Matrix(*D.shape)
+    for i, row in enumerate(D):
+        A[i] = row
+    return A
+
+
+class TestMatrix(unittest.TestCase):
+
+    def test_Cm05Matrix(self):
+        A = _covariance()
+        ew, EV = np.linalg.eigh(A)
+        C05 = EV.dot(np.diag(1. / np.sqrt(ew))).dot(EV.T)
+
+        x = np.linspace(-1., 1., A.shape[0])
+        for maxDense in [512, 0]:  # explicit matrix and eigenvector path
+            CM05 = Cm05Matrix(A, maxDense=maxDense)
+            np.testing.assert_allclose(CM05.mult(x), C05.dot(x))
+            np.testing.assert_allclose(CM05.transMult(x), C05.dot(x))
+            np.testing.assert_allclose(CM05.mult(pg.Vector(x)), C05.dot(x))
+            X = np.column_stack([x, x**2, np.ones_like(x)])
+            np.testing.assert_allclose(CM05.multMany(X), C05.dot(X))
+
+            CM05 = Cm05Matrix(A, maxDense=maxDense, dtype=np.float32)
+            y = CM05.mult(x)
+            self.assertEqual(y.dtype, np.float64)
+            np.testing.assert_allclose(y, C05.dot(x), rtol=1e-3, atol=1e-4)
+
+        with self.assertRaises(Exception):
+            Cm05Matrix(A, device='gpu')
+
+    def test_GeostatisticConstraintsMatrix(self):
+        A = _covariance()
+        ew, EV = np.linalg.eigh(A)
+        C05 = EV.dot(np.diag(1. / np.sqrt(ew))).dot(EV.T)
+        spur = C05.sum(axis=1)
+
+        x = np.linspace(-1., 1., A.shape[0])
+        C = GeostatisticConstraintsMatrix(A)
+        np.testing.assert_allclose(C.mult(x), C05.dot(x) - spur * x)
+        np.testing.assert_allclose(C.transMult(x), C05.dot(x) - spur * x)
+
+        X = np.column_stack([x, x**2])
+        np.testing.assert_allclose(C.multMany(X),
+                                   C05.dot(X) - spur[:, None] * X)
+
+        out = np.empty_like(x)
+        self.assertIs(C.mult(x, out=out), out)
+        np.testing.assert_allclose(out, C05.dot(x) - spur * x)
+
+        C = GeostatisticConstraintsMatrix(A, withRef=True)
+        np.testing.assert_allclose(C.mult(x), C05.dot(x))
+
+        C = GeostatisticConstraintsMatrix(A, dtype=np.float32)
+        np.testing.assert_allclose(C.mult(x), C05.dot(x) - spur * x,
+                                   rtol=1e-3, atol=1e-4)
+
+        C = GeostatisticConstraintsMatrix(A, maxDense=0, device='cpu')
+        self.assertIsNone(C.CM05.M)  # options are passed to Cm05Matrix
+        np.testing.assert_allclose(C.mult(x), C05.dot(x) - spur * x)
+
+    def test_MultMany(self):
+        B = np.arange(12.).reshape(4, 3)
+        A = pg.Matrix(4, 3)
+        for i, row in enumerate(B):
+            A[i] = row
+
+        l = np.array([1., 2., 3., 4.])
+        r = np.array([0.5, 1., 2.])
+        X = np.arange(6.).reshape(3, 2)
+
+        M = MultRightMatrix(A, r)
+        np.testing.assert_allclose(M.multMany(X), B.dot(X * r[:, None]))
+        np.testing.assert_allclose(M.mult(X[:, 0]), B.dot(X[:, 0] * r))
+
+        M.perm = [0, 2, 4]  # x longer than r picks entries by perm
+        x = np.arange(6.) - 2.
+        np.testing.assert_allclose(M.mult(x), B.dot(x[M.perm] * r))
+        np.testing.assert_allclose(M.mult(x[:3]), B.dot(x[:3] * r))
+        X6 = np.arange(12.).reshape(6, 2)
+        np.testing.assert_allclose(M.multMany(X6),
+                                   B.dot(X6[M.perm] * r[:, None]))
+        np.testing.assert_allclose(M.multMany(X), B.dot(X * r[:, None]))
+
+        M = MultRightMatrix(A, 2.)  # scalar r
+        np.testing.assert_allclose(M.multMany(X), B.dot(X * 2.))
+
+        M = MultLeftRightMatrix(A, l, r)
+        np.testing.assert_allclose(M.multMany(X),
+                                   B.dot(X * r[:, None]) * l[:, None])
+        np.testing.assert_allclose(M.mult(X[:, 1]), B.dot(X[:, 1] * r) * l)
+        np.testing.assert_allclose(M.transMult(l), B.T.dot(l * l) * r)
+
+        B = np.arange(10.).reshape(5, 2)  # new lengths resize the buffers
+        M.A = _matrix(B)
+        M.l = np.arange(5.) + 1.
+        M.r = np.array([2., -1.])
+        x, y = np.array([1., 3.]), np.ones(5)
+        np.testing.assert_allclose(M.mult(x), B.dot(x * M.r) * M.l)
+        np.testing.assert_allclose(M.transMult(y), B.T.dot(y * M.l) * M.r)
+
+    def test_MultOut(self):
+        B = np.arange(12.).reshape(4, 3)
+        A = _matrix(B)
+        l = np.array([1., 2., 3., 4.])
+        r = np.array([0.5, 1., 2.])
+        x, y = np.array([1., -1., 2.]), np.array([1., 0., -2., 3.])
+
+        for M, Mx, MTy in [
+                (MultLeftMatrix(A, l), B.dot(x) * l, B.T.dot(y * l)),
+                (MultRightMatrix(A, r), B.dot(x * r), B.T.dot(y) * r),
+                (MultLeftRightMatrix(A, l, r), B.dot(x * r) * l,
+                 B.T.dot(y * l) * r),
+                (Mult2Matrix(A, DiagonalMatrix(r)), B.dot(x * r),
+                 B.T.dot(y) * r)]:
+            out = np.empty(4)
+            self.assertIs(M.mult(x, out=out), out)
+            np.testing.assert_allclose(out, Mx)
+            out = np.empty(3)
+            self.assertIs(M.transMult(y, out=out), out)
+            np.testing.assert_allclose(out, MTy)
+
+        # out aliasing the input vector
+        D = DiagonalMatrix(r)
+        z = x.copy()
+        self.assertIs(D.mult(z, out=z), z)
+        np.testing.assert_allclose(z, x * r)
+
+        C = _covariance()
+        ew, EV = np.linalg.eigh(C)
+        C05 = EV.dot(np.diag(1. / np.sqrt(ew))).dot(EV.T)
+        x = np.linspace(-1., 1., C.shape[0])
+        for maxDense in [512, 0]:
+            for M, Mx in [(Cm05Matrix(C, maxDense=maxDense), C05.dot(x)),
+                          (GeostatisticConstraintsMatrix(C, maxDense=maxDense),
+                           C05.dot(x) - C05.sum(axis=1) * x)]:
+                z = x.copy()
+                self.assertIs(M.mult(z, out=z), z)
+                np.testing.assert_allclose(z, Mx)
+                z = np.concatenate([x, [0.]])  # overlapping view of z
+                self.assertIs(M.mult(z[:-1], out=z[1:]).base, z)
+                np.testing.assert_allclose(z[1:], Mx)
+
+    def test_BlockMatrixAdd(self):
+        v = np.array([1., 2., 3.])
+        B = pg.matrix.BlockMatrix()
+        B.reserve(2)
+        self.assertEqual(B.__mats__, [None, None])
+        self.assertEqual(B.__nMats__, 0)
+        B.add(v, 0, 0)  # column vector
+        B.add(v, 3, 1, transpose=True)  # row vector
+        self.assertEqual(len(B.__mats__), 2)  # reserved slots filled
+        self.assertNotIn(None, B.__mats__)
+        S = pg.matrix.SparseMapMatrix(r=2, c=3)
+        S.setVal(0, 2, 4.)
+        S.setVal(1, 0, 5.)
+        B.add(S, 4, 2, transpose=True)
+        self.assertEqual(len(B.__mats__), 3)  # appended beyond reserve
+        self.assertEqual(B.__nMats__, 3)
+        for M in B.__mats__:
+            self.assertIsInstance(M, pg.matrix.SparseMapMatrix)
+
+        B.addMatrix(S)  # no entry, kept as given
+        self.assertIs(B.__mats__[3], S)
+        self.assertEqual(B.__nMats__, 4)
+        B.recalcMatrixSize()
+        self.assertEqual(B.rows(), 7)
+        self.assertEqual(B.cols(), 4)
+
+        y = np.array(B.mult(np.ones(B.cols())))
+        np.testing.assert_allclose(y, [1., 2., 3., 6., 5., 0., 4.])
+
+    def test_NDMatrix(self):
+        num, nrows, ncols = 3, 4, 2
+        D = np.zeros((num * nrows, num * ncols))
+        J = NDMatrix(num, nrows, ncols)
+        self.assertIsInstance(J, pg.matrix.BlockMatrix)
+        self.assertEqual(J.rows(), num * nrows)
+        self.assertEqual(J.cols(), num * ncols)
+        for i, Ji in enumerate(J.Ji):
+            self.assertIsInstance(Ji, pg.Matrix)
+            Di = np.arange(nrows * ncols).reshape(nrows, ncols) + i
+            for k, row in enumerate(Di):
+                Ji[k] = row
+            D[i*nrows:(i+1)*nrows, i*ncols:(i+1)*ncols] = Di
+
+        x = np.arange(J.cols(), dtype=float)
+        y = np.arange(J.rows(), dtype=float)
+        np.testing.assert_allclose(J.mult(x), D.dot(x))
+        np.testing.assert_allclose(J.transMult(y), D.T.dot(y))
+
+    def test_BlockDiagonalMatrix(self):
+        num, nrows, ncols = 3, 4, 2
+        J = BlockDiagonalMatrix(num, nrows, ncols)
+        self.assertEqual(J.rows(), num * nrows)
+        self.assertEqual(J.cols(), num * ncols)
+
+        D = np.zeros((J.rows(), J.cols()))
+        for i, Ji in enumerate(J.Ji):
+            Ji[:] = np.arange(nrows * ncols).reshape(nrows, ncols) + i
+            D[i*nrows:(i+1)*nrows, i*ncols:(i+1)*ncols] = Ji
+
+        x = np.arange(J.cols(), dtype=float)
+        y = np.arange(J.rows(), dtype=float)
+        np.testing.assert_allclose(J.mult(x), D.dot(x))
+        np.testing.assert_allclose(J.transMult(y), D.T.dot(y))
+
+    @unittest.skipIf(importlib.util.find_spec('numba') is None,
+                     'numba not installed')
+    def test_ndMultKernels(self):
+        _ndMult, _ndTransMult = _ndMultKernels()
+        data = np.arange(24.).reshape(3, 4, 2)
+        x = np.arange(6.).reshape(3, 2)
+        y = np.empty((3, 4))
+        _ndMult(data, x, y)
+        np.testing.assert_allclose(y, np.einsum('bij,bj->bi', data, x))
+
+        x = np.arange(12.).reshape(3, 4)
+        y = np.full((3, 2), np.nan)  # output is overwritten, not accumulated
+        _ndTransMult(data, x, y)
+        np.testing.assert_allclose(y, np.einsum('bij,bi->bj', data, x))
+
+    def test_Add2Matrix(self):
+        DA = np.arange(9.).reshape(3, 3)
+        d = np.array([1., -2., 3.])
+        x = np.array([4., 5., 6.])
+        A = _matrix(DA)  # core matrix plus Python matrix
+        M = Add2Matrix(A, DiagonalMatrix(d))
+        self.assertEqual((M.rows(), M.cols()), (3, 3))
+        for _ in range(2):  # the result of A.mult is not kept between calls
+            np.testing.assert_allclose(M.mult(x), DA.dot(x) + d * x)
+            np.testing.assert_allclose(M.transMult(x), DA.T.dot(x) + d * x)
+
+        out = np.empty(3)
+        self.assertIs(M.mult(x, out=out), out)
+        np.testing.assert_allclose(out, DA.dot(x) + d * x)
+        self.assertIs(M.transMult(x, out=out), out)
+        np.testing.assert_allclose(out, DA.T.dot(x) + d * x)
+        np.testing.assert_allclose(A.mult(x), DA.dot(x))
+
+    def test_DiagonalMatrix(self):
+        d = np.array([1., -2., 3.])
+        x = np.array([4., 5., 6.])
+        D = DiagonalMatrix(d)
+        self.assertEqual((D.rows(), D.cols()), (3, 3))
+        for xi in [x, pg.Vector(x)]:
+            np.testing.assert_allclose(D.mult(xi), d * x)
+            np.testing.assert_allclose(D.transMult(xi), d * x)
+
+        out = np.empty(3)
+        self.assertIs(D.mult(x, out=out), out)
+        np.testing.assert_allclose(out, d * x)
+        self.assertIs(D.transMult(pg.Vector(x), out=out), out)
+        np.testing.assert_allclose(out, d * x)
+
+        d[0] = 10.  # in-place change of the diagonal is seen
+        np.testing.assert_allclose(D.mult(x), d * x)
+
+    def test_Mult2Matrix(self):
+        DA = np.arange(6.).reshape(2, 3)
+        DB = np.arange(12.).reshape(3, 4) - 5.
+        A, B = pg.Matrix(2, 3), pg.Matrix(3, 4)
+        for i, row in enumerate(DA):
+            A[i] = row
+        for i, row in enumerate(DB):
+            B[i] = row
+
+        x, y = np.arange(4.), np.array([1., -1.])
+        M = Mult2Matrix(A, B)
+        self.assertEqual((M.rows(), M.cols()), (2, 4))
+        np.testing.assert_allclose(M.mult(x), DA.dot(DB).dot(x))
+        np.testing.assert_allclose(M.transMult(y), DA.dot(DB).T.dot(y))
+
+        A[0] = np.ones(3)  # in-place change is seen without cached product
+        DA[0] = 1.
+        np.testing.assert_allclose(M.mult(x), DA.dot(DB).dot(x))
+
+        M = Mult2Matrix(A, B, cacheProduct=True)
+        np.testing.assert_allclose(M.mult(x), DA.dot(DB).dot(x))
+        np.testing.assert_allclose(M.transMult(y), DA.dot(DB).T.dot(y))
+        A[1] = np.zeros(3)
+        M.A = A  # reassigning A drops the cached product
+        DA[1] = 0.
+        np.testing.assert_allclose(M.mult(x), DA.dot(DB).dot(x))
+
+        E = pg.Matrix(0, 3)  # empty operand is not cached
+        M = Mult2Matrix(E, B, cacheProduct=True)
+        self.assertEqual(len(M.mult(x)), 0)
+
+
+if __name__ == '__main__':
+
+    unittest.main()